@@ -6,13 +6,193 @@ Allows connections from other devices on the same network
 
 import socket
 import json
+import logging
+import logging.handlers
+import math
+import queue
 import threading
 import time
 import numpy as np
-from collections import deque
 import http.server
-import socketserver
 import re
+import select
+import sys
+from bisect import bisect_right
+
+try:
+    import orjson
+except ImportError:  # optional: fall back to the stdlib encoder
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Patterns shared by every parser, compiled once instead of per packet
+_XML_TYPE_RE = re.compile(rb'<type>(.*?)</type>')
+_NUM_RE = re.compile(rb'-?\d+\.?\d*')
+
+# Range classification for untagged numeric packets. bisect_right buckets
+# each value by these edges (nextafter makes 10, 50 and 5000 inclusive
+# upper bounds) and _NUMERIC_RANGE_SENSOR maps the bucket to an index in
+# _NUMERIC_SENSORS, or -1 to drop it:
+#   [-50, 0) and (10, 20) -> accelerometer, [0, 10] -> EDA,
+#   [20, 50] -> temperature, [500, 5000] -> PPG
+_NUMERIC_SENSORS = ('PPG_INFRARED', 'EDA', 'TEMPERATURE_0',
+                    'ACCELEROMETER_X', 'ACCELEROMETER_Y', 'ACCELEROMETER_Z')
+_NUMERIC_ACCEL_ID = 3
+_NUMERIC_RANGE_EDGES = (-50.0, 0.0, float(np.nextafter(10, np.inf)), 20.0,
+                        float(np.nextafter(50, np.inf)), 500.0, float(np.nextafter(5000, np.inf)))
+_NUMERIC_RANGE_SENSOR = (-1, _NUMERIC_ACCEL_ID, 1, _NUMERIC_ACCEL_ID, 2, -1, 0, -1)
+
+# CORS headers for /data and preflight requests from mobile browsers
+_CORS_HEADERS = (
+    ('Access-Control-Allow-Origin', '*'),
+    ('Access-Control-Allow-Methods', 'GET, POST, OPTIONS'),
+    ('Access-Control-Allow-Headers', 'Content-Type'),
+)
+
+# Static parts of the /status page around the per-request fields
+_STATUS_HEAD = b"""<html>
+<head>
+    <title>Network EmotiBit Bridge Status</title>
+    <style>body{font-family: Arial; margin: 40px;}</style>
+</head>
+<body>
+<h1>Network EmotiBit Bridge - Status</h1>"""
+_STATUS_TAIL = b"""
+<p><strong>Mobile devices:</strong> Use the Network URL to access real data</p>
+<script>setTimeout(function(){location.reload()}, 3000);</script>
+</body>
+</html>
+"""
+
+# Progress is logged every 1024 packets (checked with a bitwise AND)
+_LOG_MASK = 1023
+
+# Most datagrams pulled off the UDP socket per wakeup
+_UDP_BATCH = 64
+
+# Received batches the parse worker may fall behind by before the UDP
+# thread starts dropping (counted in packets_dropped)
+_PARSE_QUEUE_BATCHES = 256
+
+# A datagram identical to the last parsed one within this many seconds
+# is a repeat/keepalive and is not parsed again
+_DUPLICATE_WINDOW = 0.1
+
+# Minimum gap between metric recomputes while data is streaming
+_PROCESS_COALESCE = 0.1
+
+# Requested UDP receive buffer (needs sysctl -w net.core.rmem_max=12582912)
+_UDP_RCVBUF = 12 * 1024 * 1024
+
+# Smallest size still worth requesting when the OS rejects larger ones
+_UDP_RCVBUF_MIN = 256 * 1024
+
+
+# 0, 1, 2, ... for detrending windows of up to one full ring buffer
+_RAMP_INDEX = np.arange(200, dtype=np.float64)
+
+
+def _find_peaks(detrended, threshold):
+    """Return indices of samples above threshold that beat both neighbors on each side"""
+    center = detrended[2:-2]
+    mask = ((center > detrended[1:-3]) & (center > detrended[3:-1]) &
+            (center > detrended[:-4]) & (center > detrended[4:]) &
+            (center > threshold))
+    return np.nonzero(mask)[0] + 2
+
+
+def _mean_std(values):
+    """Population mean and standard deviation from one sum and one dot product"""
+    n = len(values)
+    mean = values.sum() / n
+    return mean, math.sqrt(max(np.dot(values, values) / n - mean * mean, 0.0))
+
+
+def _ppg_peaks(values):
+    """Detrend a PPG window and return the indices of its pulse peaks"""
+    # Subtract the straight line through the end points, built from a
+    # cached index ramp rather than a fresh np.linspace
+    n = len(values)
+    detrended = _RAMP_INDEX[:n] * ((values[-1] - values[0]) / (n - 1))
+    detrended += values[0]
+    np.subtract(values, detrended, out=detrended)
+    mean_val, std_val = _mean_std(detrended)
+    return _find_peaks(detrended, mean_val + std_val * 0.7)
+
+
+def _rmssd(intervals):
+    """Root mean square of successive interval differences, in milliseconds"""
+    diffs = np.diff(intervals)
+    return math.sqrt(np.dot(diffs, diffs) / len(diffs)) * 1000
+
+
+def _rr_metrics(peak_times):
+    """Heart rate (BPM) and RMSSD (ms) from peak timestamps, None where implausible"""
+    intervals = np.diff(peak_times)
+    avg_interval = np.median(intervals)
+    if avg_interval <= 0:
+        return None, None
+    
+    heart_rate = 60 / avg_interval
+    if not 30 <= heart_rate <= 200:
+        return None, None
+    
+    rmssd = None
+    if len(intervals) > 2:
+        rmssd = _rmssd(intervals)
+        if not 5 <= rmssd <= 300:
+            rmssd = None
+    return heart_rate, rmssd
+
+
+class _RingBuf:
+    """Fixed-size ring of (timestamp, value) samples stored as two float64 arrays
+
+    Safe for one writer (the parse worker) and one reader (process_loop):
+    the writer fills a slot before bumping ``count``, the only field it
+    publishes, and the reader works from a single read of ``count``.
+    """
+
+    def __init__(self, size=200):
+        self.size = size
+        self.times = np.empty(size, dtype=np.float64)
+        self.values = np.empty(size, dtype=np.float64)
+        self.count = 0  # total samples ever appended
+
+    def __len__(self):
+        return min(self.count, self.size)
+
+    def append(self, timestamp, value):
+        slot = self.count % self.size
+        self.times[slot] = timestamp
+        self.values[slot] = value
+        self.count += 1
+
+    def latest(self, k):
+        """Return (times, values) of the newest k samples, oldest first"""
+        count = self.count
+        head = count % self.size
+        start = head - min(k, count, self.size)
+        if start >= 0:
+            return self.times[start:head].copy(), self.values[start:head].copy()
+        # Window wraps past the end of the arrays
+        return (np.concatenate((self.times[start:], self.times[:head])),
+                np.concatenate((self.values[start:], self.values[:head])))
+
+
+def _start_log_listener():
+    """Route bridge log records through a queue so only a background thread writes stdout"""
+    log_queue = queue.SimpleQueue()
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    listener = logging.handlers.QueueListener(log_queue, handler)
+    listener.start()
+    return listener
+
 
 class NetworkEmotiBitBridge:
     def __init__(self, udp_port=3000, http_port=8080):
@@ -22,19 +202,29 @@ class NetworkEmotiBitBridge:
         
         # Data storage for real sensor data
         self.sensor_data = {
-            'PPG_INFRARED': deque(maxlen=200),
-            'PPG_RED': deque(maxlen=200),
-            'PPG_GREEN': deque(maxlen=200),
-            'EDA': deque(maxlen=200),
-            'TEMPERATURE_0': deque(maxlen=200),
-            'ACCELEROMETER_X': deque(maxlen=200),
-            'ACCELEROMETER_Y': deque(maxlen=200),
-            'ACCELEROMETER_Z': deque(maxlen=200),
-            'GYROSCOPE_X': deque(maxlen=200),
-            'GYROSCOPE_Y': deque(maxlen=200),
-            'GYROSCOPE_Z': deque(maxlen=200),
+            'PPG_INFRARED': _RingBuf(200),
+            'PPG_RED': _RingBuf(200),
+            'PPG_GREEN': _RingBuf(200),
+            'EDA': _RingBuf(200),
+            'TEMPERATURE_0': _RingBuf(200),
+            'ACCELEROMETER_X': _RingBuf(200),
+            'ACCELEROMETER_Y': _RingBuf(200),
+            'ACCELEROMETER_Z': _RingBuf(200),
+            'GYROSCOPE_X': _RingBuf(200),
+            'GYROSCOPE_Y': _RingBuf(200),
+            'GYROSCOPE_Z': _RingBuf(200),
         }
         
+        # One alternation over every sensor name for the structured
+        # "NAME=value" format, so a packet is scanned once rather than
+        # once per sensor
+        sensor_names = '|'.join(re.escape(name) for name in self.sensor_data)
+        self._structured_re = re.compile(
+            rf'({sensor_names})[:\s=]+(-?\d+\.?\d*)'.encode(), re.IGNORECASE)
+        
+        # Packets are parsed as raw bytes; map CSV type fields back to names
+        self._sensor_names_bytes = {name.encode(): name for name in self.sensor_data}
+        
         # Current processed values
         self.current_data = {
             'heart_rate': None,
@@ -46,13 +236,32 @@ class NetworkEmotiBitBridge:
             'packets_received': 0,
             'last_update': 'No sensor data received',
             'connection_status': 'disconnected',
-            'raw_data_samples': 0
+            'raw_data_samples': 0,
+            'packets_dropped': 0,
+            'parse_queue_depth': 0
         }
         
-        # Stats
+        # Stats (last_packet_time is time.monotonic(), 0 until the first packet)
         self.packets_received = 0
         self.last_packet_time = 0
         self.successful_parses = 0
+        self.packets_dropped = 0
+        self.duplicates_skipped = 0
+        
+        # Batches of (data, timestamp) handed from the UDP thread to the parse
+        # worker; bounded so a stalled parser sheds load instead of memory
+        self._rx_q = queue.Queue(maxsize=_PARSE_QUEUE_BATCHES)
+        
+        # Most recent successful parse as (format, *args); parsers only
+        # store the tuple and process_loop turns it into last_update
+        self._last_parsed = None
+        self._last_reported = None
+        
+        # Set by the parse worker when a batch produced new samples
+        self._new_data = threading.Event()
+        
+        # Serialized /data response, refreshed once per process_loop tick
+        self._data_json = self.build_data_json()
 
     def get_network_ip(self):
         """Get the network IP address of this machine"""
@@ -85,19 +294,26 @@ class NetworkEmotiBitBridge:
         print("Press Ctrl+C to stop")
         print("=" * 60)
         
+        log_listener = _start_log_listener()
+        
         # Start UDP listener
         udp_thread = threading.Thread(target=self.udp_listener, daemon=True)
         udp_thread.start()
         
+        # Start parse worker
+        parser_thread = threading.Thread(target=self._parse_worker, daemon=True)
+        parser_thread.start()
+        
         # Start data processor
         process_thread = threading.Thread(target=self.process_loop, daemon=True)
         process_thread.start()
         
         # Start HTTP server - KEY CHANGE: Accept connections from any IP
         try:
-            handler = self.make_handler()
+            handler = self.make_handler(network_ip)
             # Changed from ("", port) to ("0.0.0.0", port) for network access
-            with socketserver.TCPServer(("0.0.0.0", self.http_port), handler) as httpd:
+            # No SO_REUSEPORT: a second bridge sharing the port would answer with empty data
+            with http.server.ThreadingHTTPServer(("0.0.0.0", self.http_port), handler) as httpd:
                 print(f"HTTP server accepting connections from any device on network")
                 print(f"Status page: http://{network_ip}:{self.http_port}/status")
                 print("=" * 60)
@@ -107,73 +323,139 @@ class NetworkEmotiBitBridge:
             self.running = False
         except Exception as e:
             print(f"Server error: {e}")
+        finally:
+            log_listener.stop()
 
     def udp_listener(self):
         """Listen for UDP data from EmotiBit"""
         try:
             sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
             sock.bind(('', self.udp_port))
-            sock.settimeout(2.0)
+            sock.setblocking(False)
+            
+            # Give the kernel room to queue bursts while we are parsing.
+            # Linux silently caps this at net.core.rmem_max, but macOS fails
+            # requests above kern.ipc.maxsockbuf, so step down until one is
+            # accepted (or keep the default)
+            requested = _UDP_RCVBUF
+            while requested >= _UDP_RCVBUF_MIN:
+                try:
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, requested)
+                    break
+                except OSError:
+                    requested //= 2
+            rcvbuf = sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
             
             print(f"UDP listener active on port {self.udp_port}")
+            print(f"UDP receive buffer: {rcvbuf} bytes")
+            if rcvbuf < _UDP_RCVBUF:
+                print(f"Warning: UDP receive buffer is below the requested {_UDP_RCVBUF} bytes; "
+                      f"bursts may be dropped (raise with: sysctl -w net.core.rmem_max={_UDP_RCVBUF} "
+                      f"on Linux, sysctl -w kern.ipc.maxsockbuf={2 * _UDP_RCVBUF} on macOS)")
             
             while self.running:
                 try:
-                    data, addr = sock.recvfrom(8192)
-                    self.packets_received += 1
-                    self.last_packet_time = time.time()
+                    # Connection loss is detected by process_loop from last_packet_time
+                    readable, _, _ = select.select([sock], [], [], 2.0)
+                    if not readable:
+                        continue
                     
-                    # Process the data with improved parsing
-                    data_string = data.decode('utf-8', errors='ignore')
-                    self.parse_emotibit_data_improved(data_string)
+                    # Drain everything already queued on the socket in one pass,
+                    # stamping each datagram as it is read; the timestamps
+                    # travel with the data so queueing delay does not skew them
+                    batch = []
+                    for _ in range(_UDP_BATCH):
+                        try:
+                            data, addr = sock.recvfrom(8192)
+                        except BlockingIOError:
+                            break
+                        except OSError as e:
+                            # e.g. ConnectionResetError on Windows after an ICMP
+                            # port-unreachable; keep what was already drained
+                            logger.warning("UDP error: %s", e)
+                            break
+                        batch.append((data, time.monotonic()))
                     
-                    # Update connection status
-                    self.current_data['connection_status'] = 'connected'
-                    self.current_data['packets_received'] = self.packets_received
+                    if not batch:
+                        continue
                     
-                    if self.packets_received % 1000 == 1:
-                        print(f"Processed {self.packets_received} packets, {self.successful_parses} successful parses")
-                        
-                except socket.timeout:
-                    # Check if we've lost connection
-                    if self.last_packet_time > 0 and (time.time() - self.last_packet_time) > 10:
-                        self.current_data['connection_status'] = 'disconnected'
-                        self.current_data['last_update'] = f'Lost connection {int(time.time() - self.last_packet_time)}s ago'
-                    continue
+                    self.packets_received += len(batch)
+                    self.last_packet_time = batch[-1][1]
                     
+                    # Parsing happens on the worker thread
+                    try:
+                        self._rx_q.put_nowait(batch)
+                    except queue.Full:
+                        self.packets_dropped += len(batch)
+                        
                 except Exception as e:
-                    print(f"UDP error: {e}")
+                    logger.warning("UDP error: %s", e)
                     
         except Exception as e:
-            print(f"Failed to start UDP listener: {e}")
+            logger.error("Failed to start UDP listener: %s", e)
 
-    def parse_emotibit_data_improved(self, data_string):
+    def _parse_worker(self):
+        """Parse datagram batches queued by the UDP listener"""
+        parsed = 0
+        last_data = None
+        last_timestamp = 0.0
+        while self.running:
+            try:
+                batch = self._rx_q.get(timeout=2.0)
+            except queue.Empty:
+                continue
+            
+            parses_before = self.successful_parses
+            for data, timestamp in batch:
+                # A plain bytes compare (length first, then memcmp) is cheaper
+                # than hashing and cannot collide
+                if data == last_data and timestamp - last_timestamp < _DUPLICATE_WINDOW:
+                    self.duplicates_skipped += 1
+                    continue
+                last_data = data
+                last_timestamp = timestamp
+                
+                self.parse_emotibit_data_improved(data, timestamp)
+                
+                parsed += 1
+                if parsed & _LOG_MASK == 1:
+                    logger.info("Processed %d packets, %d successful parses",
+                                parsed, self.successful_parses)
+            
+            if self.successful_parses != parses_before:
+                self._new_data.set()
+
+    def parse_emotibit_data_improved(self, data, timestamp):
         """Enhanced EmotiBit data parser"""
         try:
-            timestamp = time.time()
-            
-            # Try multiple parsing methods
-            if self.parse_xml_format(data_string, timestamp):
+            # Try multiple parsing methods, skipping formats whose marker
+            # bytes are absent. The XML and numeric parsers share one
+            # number scan, run only once either of them needs it.
+            numbers = None
+            if b'<type>' in data:
+                numbers = _NUM_RE.findall(data)
+                if self.parse_xml_format(data, numbers, timestamp):
+                    return
+            if b',' in data and self.parse_csv_format(data, timestamp):
                 return
-            if self.parse_csv_format(data_string, timestamp):
+            if numbers is None:
+                numbers = _NUM_RE.findall(data)
+            if self.parse_numeric_format(numbers, timestamp):
                 return
-            if self.parse_numeric_format(data_string, timestamp):
-                return
-            if self.parse_structured_format(data_string, timestamp):
+            if self.parse_structured_format(data, timestamp):
                 return
                 
         except Exception as e:
-            if self.packets_received % 1000 == 1:
-                print(f"Parse error: {e}")
+            if self.packets_received & _LOG_MASK == 1:
+                logger.warning("Parse error: %s", e)
 
-    def parse_xml_format(self, data_string, timestamp):
+    def parse_xml_format(self, data, numbers, timestamp):
         """Parse XML-style EmotiBit data"""
         try:
-            if '<type>' in data_string and '</type>' in data_string:
-                type_match = re.search(r'<type>(.*?)</type>', data_string)
+            if b'<type>' in data and b'</type>' in data:
+                type_match = _XML_TYPE_RE.search(data)
                 if type_match:
-                    data_type = type_match.group(1).strip()
-                    numbers = re.findall(r'-?\d+\.?\d*', data_string)
+                    data_type = type_match.group(1).strip().decode('ascii', errors='ignore')
                     values = []
                     
                     for num_str in numbers:
@@ -186,120 +468,91 @@ class NetworkEmotiBitBridge:
                     
                     if data_type in self.sensor_data and values:
                         for value in values[:5]:
-                            self.sensor_data[data_type].append({
-                                'timestamp': timestamp,
-                                'value': value
-                            })
+                            self.sensor_data[data_type].append(timestamp, value)
                         
                         self.successful_parses += 1
-                        self.current_data['last_update'] = f"XML: {data_type} = {values[0]:.3f}"
+                        self._last_parsed = ("XML: {} = {:.3f}", data_type, values[0])
                         return True
         except Exception:
             pass
         return False
 
-    def parse_csv_format(self, data_string, timestamp):
+    def parse_csv_format(self, data, timestamp):
         """Parse CSV-style EmotiBit data"""
         try:
-            lines = data_string.strip().split('\n')
-            for line in lines:
-                if ',' in line:
-                    parts = line.split(',')
-                    if len(parts) >= 3:
-                        try:
-                            if parts[1].strip() in self.sensor_data:
-                                data_type = parts[1].strip()
-                                values = []
-                                
-                                for part in parts[2:]:
-                                    try:
-                                        value = float(part.strip())
-                                        if abs(value) < 100000:
-                                            values.append(value)
-                                    except ValueError:
-                                        continue
-                                
-                                if values:
-                                    for value in values:
-                                        self.sensor_data[data_type].append({
-                                            'timestamp': timestamp,
-                                            'value': value
-                                        })
-                                    
-                                    self.successful_parses += 1
-                                    self.current_data['last_update'] = f"CSV: {data_type} = {values[0]:.3f}"
-                                    return True
-                        except (ValueError, IndexError):
-                            continue
+            for line in data.strip().split(b'\n'):
+                parts = line.split(b',')
+                if len(parts) < 3:
+                    continue
+                data_type = self._sensor_names_bytes.get(parts[1].strip())
+                if data_type is None:
+                    continue
+                
+                values = []
+                for part in parts[2:]:
+                    try:
+                        # float() skips surrounding whitespace itself
+                        value = float(part)
+                    except ValueError:
+                        continue
+                    if abs(value) < 100000:
+                        values.append(value)
+                
+                if values:
+                    for value in values:
+                        self.sensor_data[data_type].append(timestamp, value)
+                    
+                    self.successful_parses += 1
+                    self._last_parsed = ("CSV: {} = {:.3f}", data_type, values[0])
+                    return True
         except Exception:
             pass
         return False
 
-    def parse_numeric_format(self, data_string, timestamp):
+    def parse_numeric_format(self, numbers, timestamp):
         """Extract numbers and assign to sensor types"""
         try:
-            numbers = re.findall(r'-?\d+\.?\d+', data_string)
+            # Numeric packets only count numbers with two or more digits
+            numbers = [n for n in numbers if len(n.strip(b'-.')) > 1]
             if len(numbers) < 2:
                 return False
             
             values = []
             for num_str in numbers:
-                try:
-                    value = float(num_str)
-                    if -1000 <= value <= 10000 and value != 3000:
-                        values.append(value)
-                except ValueError:
-                    continue
+                value = float(num_str)
+                if -1000 <= value <= 10000 and value != 3000:
+                    values.append(value)
             
             if len(values) >= 2:
+                # Table-driven range classification; accelerometer readings
+                # rotate through X/Y/Z by position
                 for i, value in enumerate(values[:6]):
-                    if 500 <= value <= 5000:
-                        self.sensor_data['PPG_INFRARED'].append({
-                            'timestamp': timestamp,
-                            'value': value
-                        })
-                    elif 0 <= value <= 10:
-                        self.sensor_data['EDA'].append({
-                            'timestamp': timestamp,
-                            'value': value
-                        })
-                    elif 20 <= value <= 50:
-                        self.sensor_data['TEMPERATURE_0'].append({
-                            'timestamp': timestamp,
-                            'value': value
-                        })
-                    elif -50 <= value <= 50:
-                        accel_types = ['ACCELEROMETER_X', 'ACCELEROMETER_Y', 'ACCELEROMETER_Z']
-                        sensor_type = accel_types[i % 3]
-                        self.sensor_data[sensor_type].append({
-                            'timestamp': timestamp,
-                            'value': value
-                        })
+                    sensor_id = _NUMERIC_RANGE_SENSOR[bisect_right(_NUMERIC_RANGE_EDGES, value)]
+                    if sensor_id == _NUMERIC_ACCEL_ID:
+                        sensor_id += i % 3
+                    if sensor_id >= 0:
+                        self.sensor_data[_NUMERIC_SENSORS[sensor_id]].append(timestamp, value)
                 
                 self.successful_parses += 1
-                self.current_data['last_update'] = f"Numeric: {len(values)} values parsed"
+                self._last_parsed = ("Numeric: {} values parsed", len(values))
                 return True
                 
         except Exception:
             pass
         return False
 
-    def parse_structured_format(self, data_string, timestamp):
+    def parse_structured_format(self, data, timestamp):
         """Parse structured text format"""
         try:
-            for sensor_name in self.sensor_data.keys():
-                pattern = rf'{sensor_name}[:\s=]+(-?\d+\.?\d*)'
-                match = re.search(pattern, data_string, re.IGNORECASE)
-                if match:
-                    value = float(match.group(1))
-                    self.sensor_data[sensor_name].append({
-                        'timestamp': timestamp,
-                        'value': value
-                    })
-                    
-                    self.successful_parses += 1
-                    self.current_data['last_update'] = f"Structured: {sensor_name} = {value:.3f}"
-                    return True
+            match = self._structured_re.search(data)
+            if match:
+                sensor_name = match.group(1).upper().decode('ascii')
+                value = float(match.group(2))
+                self.sensor_data[sensor_name].append(timestamp, value)
+                
+                self.successful_parses += 1
+                self._last_parsed = ("Structured: {} = {:.3f}", sensor_name, value)
+                return True
         except Exception:
             pass
         return False
@@ -308,10 +561,27 @@ class NetworkEmotiBitBridge:
         """Process real data only"""
         while self.running:
             try:
+                # Recompute as soon as new samples arrive (and at least every
+                # 2 s), letting a short burst accumulate first
+                if self._new_data.wait(2.0):
+                    time.sleep(_PROCESS_COALESCE)
+                    self._new_data.clear()
+                
+                # Build the next snapshot privately and publish it with one
+                # reference swap, so readers never see a half-updated dict
+                snapshot = dict(self.current_data)
+                
                 if self.packets_received > 0 and self.successful_parses > 0:
-                    self.calculate_enhanced_metrics()
+                    snapshot.update(self.calculate_enhanced_metrics())
+                    
+                    last_parsed = self._last_parsed
+                    if last_parsed is not self._last_reported:
+                        self._last_reported = last_parsed
+                        snapshot['last_update'] = last_parsed[0].format(*last_parsed[1:])
+                    snapshot['raw_data_samples'] = sum(
+                        len(buf) for buf in self.sensor_data.values())
                 else:
-                    self.current_data.update({
+                    snapshot.update({
                         'heart_rate': None,
                         'hrv_rmssd': None,
                         'eda_tonic': None,
@@ -320,179 +590,193 @@ class NetworkEmotiBitBridge:
                         'last_update': f'Received {self.packets_received} packets, {self.successful_parses} parsed'
                     })
                 
-                self.current_data['timestamp'] = time.time()
-                time.sleep(2)
+                silence = time.monotonic() - self.last_packet_time
+                if self.last_packet_time > 0 and silence > 10:
+                    snapshot['connection_status'] = 'disconnected'
+                    snapshot['last_update'] = f'Lost connection {int(silence)}s ago'
+                elif self.last_packet_time > 0:
+                    snapshot['connection_status'] = 'connected'
+                
+                snapshot['packets_received'] = self.packets_received
+                snapshot['packets_dropped'] = self.packets_dropped
+                snapshot['parse_queue_depth'] = self._rx_q.qsize()
+                snapshot['timestamp'] = time.time()
+                self.current_data = snapshot
+                self._data_json = self.build_data_json()
                 
             except Exception as e:
-                print(f"Process error: {e}")
+                logger.error("Process error: %s", e)
                 time.sleep(2)
 
+    def parse_rate(self):
+        """Percentage of received packets that parsed, not counting skipped duplicates"""
+        attempted = self.packets_received - self.duplicates_skipped
+        return self.successful_parses / max(attempted, 1) * 100
+
+    def build_data_json(self):
+        """Serialize the current metrics into the /data response body"""
+        response_data = {
+            'type': 'sensor_data',
+            'data': self.current_data,
+            'timestamp': time.time(),
+            'real_data_only': True,
+            'network_accessible': True,
+            'parsing_stats': {
+                'packets_received': self.packets_received,
+                'successful_parses': self.successful_parses,
+                'duplicates_skipped': self.duplicates_skipped,
+                'parse_rate': self.parse_rate()
+            }
+        }
+        if orjson is not None:
+            return orjson.dumps(response_data)
+        return json.dumps(response_data, separators=(',', ':')).encode()
+
     def calculate_enhanced_metrics(self):
-        """Calculate health metrics from real sensor data"""
+        """Calculate health metrics from real sensor data, returning the updated fields"""
+        metrics = {}
         
         # Heart rate from PPG data
         ppg_data = self.sensor_data['PPG_INFRARED']
         if len(ppg_data) > 30:
             try:
-                recent_data = list(ppg_data)[-50:]
-                values = [d['value'] for d in recent_data]
-                timestamps = [d['timestamp'] for d in recent_data]
+                timestamps, values_array = ppg_data.latest(50)
                 
-                if len(values) > 20:
-                    values_array = np.array(values)
-                    detrended = values_array - np.linspace(values_array[0], values_array[-1], len(values_array))
-                    
-                    mean_val = np.mean(detrended)
-                    std_val = np.std(detrended)
-                    threshold = mean_val + std_val * 0.7
-                    
-                    peaks = []
-                    for i in range(2, len(detrended)-2):
-                        if (detrended[i] > detrended[i-1] and detrended[i] > detrended[i+1] and 
-                            detrended[i] > detrended[i-2] and detrended[i] > detrended[i+2] and
-                            detrended[i] > threshold):
-                            peaks.append(i)
+                if len(values_array) > 20:
+                    peaks = _ppg_peaks(values_array)
                     
                     if len(peaks) >= 3:
-                        peak_times = [timestamps[p] for p in peaks]
-                        intervals = np.diff(peak_times)
-                        
-                        if len(intervals) > 0:
-                            avg_interval = np.median(intervals)
-                            if avg_interval > 0:
-                                heart_rate = 60 / avg_interval
-                                
-                                if 30 <= heart_rate <= 200:
-                                    self.current_data['heart_rate'] = int(heart_rate)
-                                    
-                                    if len(intervals) > 2:
-                                        diff_intervals = np.diff(intervals)
-                                        rmssd = np.sqrt(np.mean(diff_intervals**2)) * 1000
-                                        
-                                        if 5 <= rmssd <= 300:
-                                            self.current_data['hrv_rmssd'] = int(rmssd)
+                        heart_rate, rmssd = _rr_metrics(timestamps[peaks])
+                        if heart_rate is not None:
+                            metrics['heart_rate'] = int(heart_rate)
+                        if rmssd is not None:
+                            metrics['hrv_rmssd'] = int(rmssd)
                                             
             except Exception as e:
-                print(f"HR calculation error: {e}")
+                logger.warning("HR calculation error: %s", e)
         
         # EDA processing
         eda_data = self.sensor_data['EDA']
         if len(eda_data) > 10:
             try:
-                recent_values = [d['value'] for d in list(eda_data)[-20:]]
-                if recent_values:
+                _, recent_values = eda_data.latest(20)
+                if len(recent_values):
                     tonic_level = np.median(recent_values)
                     if 0 <= tonic_level <= 100:
-                        self.current_data['eda_tonic'] = float(tonic_level)
+                        metrics['eda_tonic'] = float(tonic_level)
             except Exception as e:
-                print(f"EDA calculation error: {e}")
+                logger.warning("EDA calculation error: %s", e)
         
         # Activity level
         accel_data = self.sensor_data['ACCELEROMETER_X']
         if len(accel_data) > 15:
             try:
-                recent_values = [d['value'] for d in list(accel_data)[-30:]]
-                if recent_values:
+                _, recent_values = accel_data.latest(30)
+                if len(recent_values):
                     activity = np.std(recent_values)
-                    self.current_data['activity_level'] = float(activity)
+                    metrics['activity_level'] = float(activity)
             except Exception as e:
-                print(f"Activity calculation error: {e}")
+                logger.warning("Activity calculation error: %s", e)
         
         # Temperature
         temp_data = self.sensor_data['TEMPERATURE_0']
         if len(temp_data) > 5:
             try:
-                recent_values = [d['value'] for d in list(temp_data)[-10:]]
-                if recent_values:
+                _, recent_values = temp_data.latest(10)
+                if len(recent_values):
                     avg_temp = np.mean(recent_values)
                     if 15 <= avg_temp <= 60:
-                        self.current_data['temperature'] = float(avg_temp)
+                        metrics['temperature'] = float(avg_temp)
             except Exception as e:
-                print(f"Temperature calculation error: {e}")
+                logger.warning("Temperature calculation error: %s", e)
+        
+        return metrics
 
-    def make_handler(self):
+    def make_handler(self, network_ip):
         """Create HTTP request handler with CORS support"""
         bridge = self
         
+        # The address and URLs on /status are fixed for the server's lifetime,
+        # so that part of the page is rendered once here
+        status_ip = f"""
+                    <p><strong>Network IP:</strong> {network_ip}</p>""".encode()
+        status_urls = f"""
+                    
+                    <h2>Access URLs:</h2>
+                    <p><strong>Local:</strong> <a href="http://localhost:{bridge.http_port}/data">http://localhost:{bridge.http_port}/data</a></p>
+                    <p><strong>Network:</strong> <a href="http://{network_ip}:{bridge.http_port}/data">http://{network_ip}:{bridge.http_port}/data</a></p>
+                    """.encode()
+        
         class NetworkHandler(http.server.SimpleHTTPRequestHandler):
+            # Every response carries a Content-Length, so dashboards polling
+            # /data can reuse one keep-alive connection
+            protocol_version = 'HTTP/1.1'
+            # Close idle keep-alive connections (phones often sleep or leave
+            # Wi-Fi without a FIN) instead of holding a server thread forever
+            timeout = 30
+            
+            def send_cors_headers(self):
+                for name, value in _CORS_HEADERS:
+                    self.send_header(name, value)
+            
             def do_GET(self):
                 if self.path == '/data':
+                    # Serialized once per process_loop tick, not per request
+                    data_json = bridge._data_json
+                    
                     self.send_response(200)
                     self.send_header('Content-type', 'application/json')
+                    self.send_header('Content-Length', str(len(data_json)))
                     # IMPORTANT: Allow cross-origin requests for mobile devices
-                    self.send_header('Access-Control-Allow-Origin', '*')
-                    self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-                    self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+                    self.send_cors_headers()
                     self.end_headers()
                     
-                    response_data = {
-                        'type': 'sensor_data',
-                        'data': bridge.current_data.copy(),
-                        'timestamp': time.time(),
-                        'real_data_only': True,
-                        'network_accessible': True,
-                        'parsing_stats': {
-                            'packets_received': bridge.packets_received,
-                            'successful_parses': bridge.successful_parses,
-                            'parse_rate': bridge.successful_parses / max(bridge.packets_received, 1) * 100
-                        }
-                    }
-                    
-                    self.wfile.write(json.dumps(response_data).encode())
+                    self.wfile.write(data_json)
                     
                 elif self.path == '/status':
-                    self.send_response(200)
-                    self.send_header('Content-type', 'text/html')
-                    self.send_header('Access-Control-Allow-Origin', '*')
-                    self.end_headers()
-                    
-                    network_ip = bridge.get_network_ip()
-                    conn_status = bridge.current_data['connection_status']
+                    # One read of the published snapshot for the whole page
+                    snapshot = bridge.current_data
+                    conn_status = snapshot['connection_status']
                     status_color = 'green' if conn_status == 'connected' else 'red'
-                    parse_rate = bridge.successful_parses / max(bridge.packets_received, 1) * 100
+                    parse_rate = bridge.parse_rate()
                     
-                    status_html = f"""
-                    <html>
-                    <head>
-                        <title>Network EmotiBit Bridge Status</title>
-                        <style>body{{font-family: Arial; margin: 40px;}}</style>
-                    </head>
-                    <body>
-                    <h1>Network EmotiBit Bridge - Status</h1>
-                    <p><strong>Network IP:</strong> {network_ip}</p>
+                    # Only the live fields are formatted per request
+                    status_stats = f"""
                     <p><strong>Connection:</strong> <span style="color: {status_color};">{conn_status.upper()}</span></p>
                     <p><strong>Packets Received:</strong> {bridge.packets_received}</p>
                     <p><strong>Successfully Parsed:</strong> {bridge.successful_parses}</p>
+                    <p><strong>Duplicates Skipped:</strong> {bridge.duplicates_skipped}</p>
                     <p><strong>Parse Success Rate:</strong> {parse_rate:.1f}%</p>
-                    <p><strong>Last Update:</strong> {bridge.current_data['last_update']}</p>
-                    
-                    <h2>Access URLs:</h2>
-                    <p><strong>Local:</strong> <a href="http://localhost:{bridge.http_port}/data">http://localhost:{bridge.http_port}/data</a></p>
-                    <p><strong>Network:</strong> <a href="http://{network_ip}:{bridge.http_port}/data">http://{network_ip}:{bridge.http_port}/data</a></p>
-                    
+                    <p><strong>Last Update:</strong> {snapshot['last_update']}</p>""".encode()
+                    status_sensors = f"""
                     <h2>Real Sensor Data:</h2>
                     <ul>
-                    <li>Heart Rate: {bridge.current_data['heart_rate'] or 'No data'} BPM</li>
-                    <li>HRV: {bridge.current_data['hrv_rmssd'] or 'No data'} ms</li>
-                    <li>EDA: {bridge.current_data['eda_tonic'] or 'No data'}</li>
-                    <li>Activity: {bridge.current_data['activity_level'] or 'No data'}</li>
-                    <li>Temperature: {bridge.current_data['temperature'] or 'No data'}°C</li>
+                    <li>Heart Rate: {snapshot['heart_rate'] or 'No data'} BPM</li>
+                    <li>HRV: {snapshot['hrv_rmssd'] or 'No data'} ms</li>
+                    <li>EDA: {snapshot['eda_tonic'] or 'No data'}</li>
+                    <li>Activity: {snapshot['activity_level'] or 'No data'}</li>
+                    <li>Temperature: {snapshot['temperature'] or 'No data'}°C</li>
                     </ul>
+                    """.encode()
+                    status_page = b''.join((_STATUS_HEAD, status_ip, status_stats,
+                                            status_urls, status_sensors, _STATUS_TAIL))
                     
-                    <p><strong>Mobile devices:</strong> Use the Network URL to access real data</p>
-                    <script>setTimeout(function(){{location.reload()}}, 3000);</script>
-                    </body>
-                    </html>
-                    """
+                    self.send_response(200)
+                    self.send_header('Content-type', 'text/html')
+                    self.send_header('Content-Length', str(len(status_page)))
+                    self.send_header('Access-Control-Allow-Origin', '*')
+                    self.end_headers()
+                    
+                    self.wfile.write(status_page)
                     
-                    self.wfile.write(status_html.encode())
+                else:
+                    self.send_error(404)
                     
             def do_OPTIONS(self):
                 # Handle preflight requests for CORS
                 self.send_response(200)
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-                self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+                self.send_header('Content-Length', '0')
+                self.send_cors_headers()
                 self.end_headers()
                     
             def log_message(self, format, *args):
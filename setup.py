@@ -4,74 +4,37 @@ EmotiBit CardioGuard Setup Script
 Automatically installs dependencies and configures the system
 """
 
+import importlib.util
 import os
+import re
 import sys
 import subprocess
 import platform
+import stat
+import threading
+import time
 
-def install_requirements():
-    """Install required Python packages"""
-    print("📦 Installing required packages...")
-    
-    packages = [
-        'numpy',
-        'scipy', 
-        'websockets',
-        'asyncio'
-    ]
-    
-    for package in packages:
-        try:
-            print(f"Installing {package}...")
-            subprocess.check_call([sys.executable, '-m', 'pip', 'install', package])
-            print(f"✅ {package} installed successfully")
-        except subprocess.CalledProcessError:
-            print(f"❌ Failed to install {package}")
-            return False
-    
-    return True
+# Base pip command: skip the self-update check and never wait on a prompt
+PIP_INSTALL = [sys.executable, '-m', 'pip', 'install',
+               '--disable-pip-version-check', '--no-input']
 
-def create_batch_files():
-    """Create convenient batch files for Windows"""
-    if platform.system() == 'Windows':
-        # Create start_bridge.bat
-        with open('start_bridge.bat', 'w') as f:
-            f.write('@echo off\n')
-            f.write('echo Starting EmotiBit UDP Bridge...\n')
-            f.write('python emotibit_bridge.py\n')
-            f.write('pause\n')
-        
-        # Create start_cardioguard.bat  
-        with open('start_cardioguard.bat', 'w') as f:
-            f.write('@echo off\n')
-            f.write('echo Opening CardioGuard AI...\n')
-            f.write('start cardioguard_realtime.html\n')
-        
-        print("✅ Created Windows batch files")
-    
-    # Create shell scripts for Linux/Mac
-    else:
-        # Create start_bridge.sh
-        with open('start_bridge.sh', 'w') as f:
-            f.write('#!/bin/bash\n')
-            f.write('echo "Starting EmotiBit UDP Bridge..."\n')
-            f.write('python3 emotibit_bridge.py\n')
-        
-        os.chmod('start_bridge.sh', 0o755)
-        
-        # Create start_cardioguard.sh
-        with open('start_cardioguard.sh', 'w') as f:
-            f.write('#!/bin/bash\n')
-            f.write('echo "Opening CardioGuard AI..."\n')
-            f.write('open cardioguard_realtime.html || xdg-open cardioguard_realtime.html\n')
-        
-        os.chmod('start_cardioguard.sh', 0o755)
-        
-        print("✅ Created shell scripts")
+# Declarative dependency list; setup.py only drives pip and writes helper files
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+REQUIREMENTS_FILE = os.path.join(PROJECT_DIR, 'requirements.txt')
 
-def create_emotibit_config():
-    """Create EmotiBit configuration instructions"""
-    config_text = """
+# Optional fully pinned, hash-checked set (pip-compile --generate-hashes
+# requirements.txt -o requirements.lock); when present pip skips resolution
+LOCK_FILE = os.path.join(PROJECT_DIR, 'requirements.lock')
+
+# Project-local wheel cache so re-runs skip downloads; an existing
+# PIP_CACHE_DIR (e.g. a persistent CI cache) takes precedence
+PIP_CACHE_DIR = os.path.join(PROJECT_DIR, '.pip-cache')
+
+# Seconds before a stalled pip run is killed (scipy wheels are large)
+PIP_TIMEOUT = 600
+
+# Contents of the generated EmotiBit_Config.txt
+CONFIG_TEXT = """
 # EmotiBit Configuration for CardioGuard AI
 
 ## Step 1: Configure EmotiBit UDP Output
@@ -100,15 +63,9 @@ UDP_DATA_TYPES=PPG_INFRARED,PPG_RED,EDA,TEMPERATURE_0,ACCELEROMETER_X,ACCELEROME
 - Verify EmotiBit is properly paired and connected
 - Check console output for error messages
 """
-    
-    with open('EmotiBit_Config.txt', 'w') as f:
-        f.write(config_text)
-    
-    print("✅ Created EmotiBit configuration guide")
 
-def create_readme():
-    """Create comprehensive README file"""
-    readme_text = """# CardioGuard AI - EmotiBit Integration
+# Contents of the generated README.md
+README_TEXT = """# CardioGuard AI - EmotiBit Integration
 
 ## 🚀 Quick Start
 
@@ -204,21 +161,192 @@ For issues:
 3. Test with demo mode (auto-starts after 10 seconds)
 4. Review setup steps in EmotiBit_Config.txt
 """
+
+def run_pip(args, timeout=PIP_TIMEOUT):
+    """Run pip install with live output; retry once with network retries if it stalls"""
+    for attempt in (list(args), ['--retries', '5', '--timeout', '30', *args]):
+        proc = subprocess.Popen([*PIP_INSTALL, *attempt], stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT, text=True, bufsize=1)
+        # Watchdog kills pip if it runs past the deadline
+        watchdog = threading.Timer(timeout, proc.kill)
+        started = time.monotonic()
+        watchdog.start()
+        try:
+            for line in proc.stdout:
+                print(line, end='')
+            returncode = proc.wait()
+        finally:
+            watchdog.cancel()
+            proc.stdout.close()
+        
+        if returncode == 0:
+            return True
+        if time.monotonic() - started < timeout:
+            return False
+        print(f"⚠️ pip timed out after {timeout}s")
+    
+    return False
+
+def read_requirements():
+    """Return the requirement specifiers listed in requirements.txt"""
+    with open(REQUIREMENTS_FILE) as f:
+        lines = (line.split('#', 1)[0].strip() for line in f)
+        return [line for line in lines if line]
+
+def install_requirements():
+    """Install required Python packages"""
+    print("📦 Installing required packages...")
+    
+    packages = read_requirements()
+    use_lock = os.path.exists(LOCK_FILE)
+    
+    # Re-runs skip pip entirely when everything is already importable. An
+    # existing install says nothing about the pinned versions and hashes,
+    # so with a lock file pip always runs (and is quick when it matches)
+    if not use_lock:
+        missing = [p for p in packages
+                   if importlib.util.find_spec(re.split(r'[\[<>=!~;\s]', p, maxsplit=1)[0].replace('-', '_')) is None]
+        if not missing:
+            print("✅ All packages already installed")
+            return True
+        packages = missing
+    
+    # Inherited by every pip subprocess below
+    os.environ.setdefault('PIP_CACHE_DIR', PIP_CACHE_DIR)
+    
+    # If pip has to compile numpy/scipy from source, build on every core
+    jobs = str(os.cpu_count() or 1)
+    os.environ.setdefault('MAKEFLAGS', f'-j{jobs}')
+    os.environ.setdefault('CMAKE_BUILD_PARALLEL_LEVEL', jobs)
+    os.environ.setdefault('MAX_JOBS', jobs)
+    
+    # Current pip/wheel/setuptools so builds produce cacheable wheels
+    if not run_pip(['--upgrade', 'pip', 'wheel', 'setuptools']):
+        print("⚠️ Could not upgrade pip/wheel, continuing with installed versions")
+    
+    # The lock already lists every transitive pin, so no resolver run is needed
+    if use_lock:
+        print(f"Installing pinned packages from {os.path.basename(LOCK_FILE)}...")
+        if run_pip(['--prefer-binary', '--no-deps', '--require-hashes', '-r', LOCK_FILE]):
+            print("✅ Packages installed successfully")
+            return True
+        print(f"❌ Failed to install from {os.path.basename(LOCK_FILE)}")
+        return False
+    
+    # One pip run resolves and downloads everything together instead of
+    # paying interpreter and resolver startup once per package
+    print(f"Installing {', '.join(packages)}...")
+    if run_pip(['--prefer-binary', *packages]):
+        print("✅ Packages installed successfully")
+        return True
+    print("⚠️ Batch install failed, retrying packages one at a time...")
     
-    with open('README.md', 'w') as f:
-        f.write(readme_text)
+    # Fall back to per-package installs to find which one is failing; the
+    # results are reported together so pip's output does not bury them
+    success = True
+    results = []
+    for package in packages:
+        print(f"Installing {package}...")
+        if run_pip(['--prefer-binary', package]):
+            results.append(f"✅ {package} installed successfully")
+        else:
+            results.append(f"❌ Failed to install {package}")
+            success = False
+    
+    sys.stdout.write('\n'.join(results) + '\n')
+    sys.stdout.flush()
+    return success
+
+def has_content(path, content):
+    """Return True if path already exists with exactly this text"""
+    try:
+        with open(path) as f:
+            return f.read() == content
+    except OSError:
+        return False
+
+def write_if_changed(path, content):
+    """Write a text file, leaving it (and its mtime) alone when already up to date"""
+    if has_content(path, content):
+        return
+    with open(path, 'w') as f:
+        f.write(content)
+
+def write_script(path, content):
+    """Write an executable script with mode 0o755"""
+    if has_content(path, content):
+        # Up to date, but it may have lost its exec bit since
+        if not os.stat(path).st_mode & stat.S_IXUSR:
+            os.chmod(path, 0o755)
+        return
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o755)
+    # os.open only applies the mode when it creates the file
+    if not os.fstat(fd).st_mode & stat.S_IXUSR:
+        os.fchmod(fd, 0o755)
+    with os.fdopen(fd, 'w') as f:
+        f.write(content)
+
+def create_batch_files():
+    """Create convenient batch files for Windows"""
+    if platform.system() == 'Windows':
+        # Create start_bridge.bat
+        write_if_changed('start_bridge.bat',
+                         '@echo off\n'
+                         'echo Starting EmotiBit UDP Bridge...\n'
+                         'python emotibit_bridge.py\n'
+                         'pause\n')
+        
+        # Create start_cardioguard.bat  
+        write_if_changed('start_cardioguard.bat',
+                         '@echo off\n'
+                         'echo Opening CardioGuard AI...\n'
+                         'start cardioguard_realtime.html\n')
+        
+        print("✅ Created Windows batch files")
+    
+    # Create shell scripts for Linux/Mac
+    else:
+        # Create start_bridge.sh
+        write_script('start_bridge.sh',
+                     '#!/usr/bin/env bash\n'
+                     'set -euo pipefail\n'
+                     'echo "Starting EmotiBit UDP Bridge..."\n'
+                     'exec python3 emotibit_bridge.py\n')
+        
+        # Create start_cardioguard.sh
+        write_script('start_cardioguard.sh',
+                     '#!/usr/bin/env bash\n'
+                     'set -euo pipefail\n'
+                     'echo "Opening CardioGuard AI..."\n'
+                     'if command -v xdg-open >/dev/null 2>&1; then\n'
+                     '    exec xdg-open cardioguard_realtime.html\n'
+                     'else\n'
+                     '    exec open cardioguard_realtime.html\n'
+                     'fi\n')
+        
+        print("✅ Created shell scripts")
+
+def create_emotibit_config():
+    """Create EmotiBit configuration instructions"""
+    write_if_changed('EmotiBit_Config.txt', CONFIG_TEXT)
+    
+    print("✅ Created EmotiBit configuration guide")
+
+def create_readme():
+    """Create comprehensive README file"""
+    write_if_changed('README.md', README_TEXT)
     
     print("✅ Created comprehensive README")
 
 def main():
     """Main setup function"""
-    print("🔧 CardioGuard AI - EmotiBit Setup")
-    print("=" * 50)
+    sys.stdout.write("🔧 CardioGuard AI - EmotiBit Setup\n" + "=" * 50 + "\n")
+    sys.stdout.flush()
     
     # Install dependencies
     if not install_requirements():
-        print("❌ Failed to install dependencies. Please install manually:")
-        print("pip install numpy scipy websockets")
+        sys.stdout.write("❌ Failed to install dependencies. Please install manually:\n"
+                         "pip install -r requirements.txt\n")
         return
     
     # Create helper files
@@ -226,15 +354,16 @@ def main():
     create_emotibit_config()
     create_readme()
     
-    print("\n" + "=" * 50)
-    print("✅ Setup completed successfully!")
-    print("\n📋 Next Steps:")
-    print("1. Configure your EmotiBit (see EmotiBit_Config.txt)")
-    print("2. Run: python emotibit_bridge.py")
-    print("3. Open: cardioguard_realtime.html")
-    print("\n🎯 Your EmotiBit should send UDP data to localhost:12345")
-    print("🌐 The web app will connect via WebSocket on port 8765")
-    print("\n📖 See README.md for detailed instructions")
+    # Final summary goes out in one write
+    sys.stdout.write("\n" + "=" * 50 + "\n"
+                     "✅ Setup completed successfully!\n"
+                     "\n📋 Next Steps:\n"
+                     "1. Configure your EmotiBit (see EmotiBit_Config.txt)\n"
+                     "2. Run: python emotibit_bridge.py\n"
+                     "3. Open: cardioguard_realtime.html\n"
+                     "\n🎯 Your EmotiBit should send UDP data to localhost:12345\n"
+                     "🌐 The web app will connect via WebSocket on port 8765\n"
+                     "\n📖 See README.md for detailed instructions\n")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file